@@ -1,19 +1,29 @@
 from __future__ import annotations
 
+import asyncio
 import datetime as dt
-from typing import Optional
+from itertools import chain
+from typing import Iterable, Iterator, Optional
 
 from fastapi import APIRouter, File, Form, HTTPException, UploadFile
-from pydantic import BaseModel, Field
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, ConfigDict, Field
 
 from app.services.agent import AgentService
-from app.services.preprocess import PriceMatrix, clean_stock_data, parse_uploaded_prices
+from app.services.preprocess import (
+    PriceMatrix,
+    RawRecord,
+    clean_stock_data,
+    iter_uploaded_prices,
+)
 from app.services.sources import load_market_data
 
 router = APIRouter()
 
 
 class AnalysisRequest(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     query: str = Field(..., description="User natural-language question")
     tickers: Optional[list[str]] = Field(
         default=None, description="Symbols to download via yfinance"
@@ -41,6 +51,45 @@ class AnalysisResponse(BaseModel):
 agent_service = AgentService()
 
 
+def _parse_tickers(value: Optional[str]) -> Optional[list[str]]:
+    if not value:
+        return None
+    symbols = [symbol.strip().upper() for symbol in value.split(",")]
+    return [symbol for symbol in symbols if symbol] or None
+
+
+def _parse_date(value: Optional[str], field_name: str) -> Optional[dt.date]:
+    if value is None or value == "":
+        return None
+    try:
+        return dt.date.fromisoformat(value)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Invalid {field_name} format. Expected YYYY-MM-DD.",
+        ) from exc
+
+
+def _open_records(records: Iterator[RawRecord]) -> Optional[Iterator[RawRecord]]:
+    """Pull the first record so emptiness is known without draining the stream."""
+
+    first = next(records, None)
+    if first is None:
+        return None
+    return chain((first,), records)
+
+
+async def _parse_upload(
+    upload_file: UploadFile, fallback_tickers: list[str]
+) -> Optional[Iterator[RawRecord]]:
+    records = iter_uploaded_prices(
+        upload_file.file,
+        upload_file.filename,
+        fallback_tickers=fallback_tickers,
+    )
+    return await run_in_threadpool(_open_records, records)
+
+
 @router.post("/", response_model=AnalysisResponse)
 async def run_analysis(
     query: str = Form(..., description="User natural-language question"),
@@ -58,70 +107,59 @@ async def run_analysis(
         None, description="optional file upload"
     ),
 ) -> AnalysisResponse:
-    parsed_tickers = None
-    if tickers:
-        symbols = [symbol.strip().upper() for symbol in tickers.split(",")]
-        parsed_tickers = [symbol for symbol in symbols if symbol]
-        if not parsed_tickers:
-            parsed_tickers = None
-
-    def _parse_date(value: Optional[str], field_name: str) -> Optional[dt.date]:
-        if value is None or value == "":
-            return None
-        try:
-            return dt.date.fromisoformat(value)
-        except ValueError as exc:
-            raise HTTPException(
-                status_code=422,
-                detail=f"Invalid {field_name} format. Expected YYYY-MM-DD.",
-            ) from exc
-
-    request = AnalysisRequest(
+    # Form fields are parsed into their final types here, so skip re-validation.
+    request = AnalysisRequest.model_construct(
         query=query,
-        tickers=parsed_tickers,
+        tickers=_parse_tickers(tickers),
         start_date=_parse_date(start_date, "start_date"),
         end_date=_parse_date(end_date, "end_date"),
     )
-    plan = agent_service.interpret_query(request.query)
-    raw_records: list[dict[str, object]] = []
-    fallback_tickers: list[str] = []
-    if request.tickers:
-        fallback_tickers.extend(request.tickers)
-    else:
-        fallback_tickers.extend(plan.tickers)
-    if upload_file and upload_file.filename:
-        file_bytes = await upload_file.read()
-        raw_records.extend(
-            parse_uploaded_prices(
-                file_bytes,
-                upload_file.filename,
-                fallback_tickers=fallback_tickers,
-            )
+    has_upload = upload_file is not None and bool(upload_file.filename)
+    if has_upload:
+        await upload_file.seek(0)
+
+    raw_records: Optional[Iterable[RawRecord]] = None
+    if has_upload and request.tickers:
+        # Explicit tickers make the upload independent of the plan, so parse it
+        # while the planner (possibly an LLM round trip) is still running.
+        plan, raw_records = await asyncio.gather(
+            run_in_threadpool(agent_service.interpret_query, request.query),
+            _parse_upload(upload_file, list(request.tickers)),
         )
+    else:
+        plan = await run_in_threadpool(agent_service.interpret_query, request.query)
+        if has_upload:
+            raw_records = await _parse_upload(upload_file, list(plan.tickers))
     derived_tickers = request.tickers or list(plan.tickers)
-    if not raw_records and derived_tickers:
+    if raw_records is None and derived_tickers:
         derived_end = request.end_date or plan.end_date or agent_service.current_date()
         derived_start = request.start_date or plan.start_date
         if derived_start is None:
             derived_start = agent_service.default_lookback(12, derived_end)
-        raw_records = load_market_data(
+        market_records = await run_in_threadpool(
+            load_market_data,
             tickers=derived_tickers,
             start=derived_start,
             end=derived_end,
         )
-        if not raw_records:
+        if not market_records:
             raise HTTPException(status_code=404, detail="No market data available for the requested tickers")
-    if not raw_records:
+        raw_records = market_records
+    if raw_records is None:
         raise HTTPException(
             status_code=400,
             detail="Provide either tickers or an uploaded price file",
         )
 
-    cleaned: PriceMatrix = clean_stock_data(raw_records)
+    # Uploaded records stay a lazy stream here; clean_stock_data consumes them
+    # row by row rather than from a fully materialised list.
+    cleaned: PriceMatrix = await run_in_threadpool(clean_stock_data, raw_records)
     if cleaned.is_empty():
         raise HTTPException(status_code=422, detail="Unable to clean the provided stock data")
 
-    result = agent_service.run_analysis(request.query, cleaned, plan=plan)
+    result = await run_in_threadpool(
+        agent_service.run_analysis, request.query, cleaned, plan=plan
+    )
 
     return AnalysisResponse(
         analysis=result.summary,
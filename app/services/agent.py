@@ -2,12 +2,21 @@ from __future__ import annotations
 
 import calendar
 import datetime as dt
+import hashlib
 import json
 import os
 import re
-import textwrap
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Callable, Sequence
 
+try:  # pragma: no cover - faster JSON codec when installed
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None  # type: ignore[assignment]
+
 try:  # pragma: no cover - optional dependency for local development
     from openai import OpenAI
 except ImportError:  # pragma: no cover - the service still runs without LLM access
@@ -20,6 +29,12 @@ from app.tools import rsi, sma, zscore
 
 ToolFn = Callable[[PriceMatrix], ToolResult]
 
+_TOOLS: dict[str, ToolFn] = {
+    "zscore": zscore.analyze_zscore,
+    "rsi": rsi.analyze_rsi,
+    "sma": sma.analyze_sma,
+}
+
 _NUMBER_WORDS: dict[str, int] = {
     "one": 1,
     "two": 2,
@@ -33,19 +48,160 @@ _NUMBER_WORDS: dict[str, int] = {
     "ten": 10,
     "eleven": 11,
     "twelve": 12,
+    "half": 6,
+    "half-year": 6,
+    "half year": 6,
 }
 
+# Query patterns are compiled once at import instead of going through re's cache
+# on every interpret_query call. Quantities may only start at the beginning of a
+# digit or letter run; a leftmost match always does anyway, and the lookbehinds
+# keep long runs from being rescanned at every offset (quadratic backtracking).
+_RELATIVE_WINDOW_RE = re.compile(
+    r"(?P<quantity>(?<!\d)\d+|(?<![a-z])[a-z]+)\s*(?P<unit>years?|yrs?|y|months?|mos?|m|weeks?|wks?|w|days?|d)"
+)
+# One alternation covers every relative-period form so a query is scanned once;
+# the outer group names tell _extract_relative_period which form matched.
+_RELATIVE_PERIOD_RE = re.compile(
+    r"(?P<english>(?:past|last|trailing)\s+(?P<english_quantity>\d+|one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve|half)\s+(?P<english_unit>day|days|week|weeks|month|months|year|years))"
+    r"|(?P<shorthand>(?P<shorthand_quantity>(?<!\d)\d+)(?P<shorthand_unit>y|yr|yrs|m|mo|mos|w|wk|wks|d))"
+    r"|(?P<year>(?:last|past) year)"
+    r"|(?P<half>(?:last|past) half)"
+)
+_UPPERCASE_TOKEN_RE = re.compile(r"\b([A-Z]{1,5})\b")
+
+# Phrases that pick a tool when no tool is named outright, in fallback order.
+_TOOL_ALIASES: dict[str, str] = {
+    "moving average": "sma",
+    "relative strength": "rsi",
+    "z-score": "zscore",
+    "z score": "zscore",
+}
+_ALIAS_TOOL_ORDER = tuple(dict.fromkeys(_TOOL_ALIASES.values()))
+
+_PERIOD_UNITS: dict[str, str] = {
+    "d": "day",
+    "day": "day",
+    "days": "day",
+    "w": "week",
+    "wk": "week",
+    "wks": "week",
+    "week": "week",
+    "weeks": "week",
+    "m": "month",
+    "mo": "month",
+    "mos": "month",
+    "month": "month",
+    "months": "month",
+    "y": "year",
+    "yr": "year",
+    "yrs": "year",
+    "year": "year",
+    "years": "year",
+}
+
+# Analyses run on the router's anyio worker threads, whose default limiter allows
+# this many at once.
+_MAX_CONCURRENT_ANALYSES = 40
+
+# Shared by every AgentService so services never own (or leak) worker threads.
+# Each analysis runs one tool on its own thread and fans the rest out here, so
+# this size lets every concurrent analysis run all of its tools side by side.
+# Threads are only started as the pool fills up.
+_TOOL_POOL = ThreadPoolExecutor(
+    max_workers=(len(_TOOLS) - 1) * _MAX_CONCURRENT_ANALYSES,
+    thread_name_prefix="agent-tool",
+)
+
+_LLM_MODEL = "gpt-5"
+_PLAN_CACHE_SIZE = 256
+_SUMMARY_CACHE_SIZE = 256
+
+_PLANNER_PROMPT_TEMPLATE = """\
+You are a planning assistant for an investment statistics service.
+Available analytics tools: {tools}.
+Respond with strict JSON shaped as:
+{{
+    "tools": [tool_names...],
+    "tickers": [ticker_symbols...],
+    "start_date": "YYYY-MM-DD" | null,
+    "end_date": "YYYY-MM-DD" | null,
+    "lookback": {{"quantity": <int>, "unit": "day/week/month/year"}} | null
+}}
+- Tool names must come from the provided list only.
+- Ticker symbols must be upper-case.
+- Capture relative timeframes (e.g. "last six months") inside the lookback object.
+- Set any unspecified field to null.
+User query: "{query}"."""
+
+_SUMMARY_PROMPT_TEMPLATE = """\
+You are an investment analyst. Summarise the following tool outputs in a concise paragraph.
+User query: {query}
+Tool outputs (JSON): {context}
+Provide actionable insights and mention notable divergences."""
+
+
+if orjson is not None:
+    _json_loads = orjson.loads
+
+    def _json_dumps(value: object, sort_keys: bool = False) -> bytes:
+        return orjson.dumps(value, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+
+else:
+    _json_loads = json.loads
+
+    def _json_dumps(value: object, sort_keys: bool = False) -> bytes:
+        return json.dumps(value, sort_keys=sort_keys).encode("utf-8")
+
+
+# Pure in (reference, months) and hit with the same "today" on every query.
+@lru_cache(maxsize=512)
+def _months_ago(reference: dt.date, months: int) -> dt.date:
+    year_delta, month_index = divmod(reference.month - 1 - months, 12)
+    year = reference.year + year_delta
+    month = month_index + 1
+    day = min(reference.day, calendar.monthrange(year, month)[1])
+    return dt.date(year, month, day)
+
+
+# One client (and its HTTP connection pool) per API key, shared by every service.
+# Only successfully built clients are kept, so a transient construction failure
+# is retried by the next service rather than disabling the LLM for the process.
+_llm_clients: dict[str, object] = {}
+_llm_clients_lock = threading.Lock()
+
+
+def _shared_llm_client(api_key: str) -> object | None:
+    with _llm_clients_lock:
+        client = _llm_clients.get(api_key)
+        if client is None:
+            try:  # pragma: no cover - creating the remote client is not unit tested
+                client = OpenAI(api_key=api_key)
+            except Exception:
+                return None
+            _llm_clients[api_key] = client
+    return client
+
 
 class AgentService:
     """Interpret natural-language queries and orchestrate analytics tools."""
 
-    def __init__(self, llm_client: object | None = None) -> None:
-        self._tool_map: dict[str, ToolFn] = {
-            "zscore": zscore.analyze_zscore,
-            "rsi": rsi.analyze_rsi,
-            "sma": sma.analyze_sma,
-        }
+    def __init__(self, llm_client: object | None = None, cache_summaries: bool = True) -> None:
+        self._tool_map: dict[str, ToolFn] = dict(_TOOLS)
+        self._all_tool_items: tuple[tuple[str, ToolFn], ...] = tuple(self._tool_map.items())
+        self._tool_names: tuple[str, ...] = tuple(self._tool_map)
+        self._tool_names_text = ", ".join(self._tool_names)
+        self._tool_keyword_pattern = re.compile(
+            "|".join(re.escape(keyword) for keyword in (*self._tool_names, *_TOOL_ALIASES))
+        )
         self._llm_client = llm_client or self._build_llm_client()
+        # Set STAT_TOOL_FAST_PATH=0 to always consult the LLM planner when available.
+        fast_path_setting = os.getenv("STAT_TOOL_FAST_PATH", "1").strip().lower()
+        self._fast_path = fast_path_setting not in {"0", "false", "no", "off"}
+        self._cache_summaries = cache_summaries
+        self._plan_cache: OrderedDict[tuple[str, dt.date], QueryPlan] = OrderedDict()
+        self._summary_cache: OrderedDict[str, str] = OrderedDict()
+        self._cache_lock = threading.Lock()
         self._keyword_ticker_map: dict[str, str] = {
             "apple": "AAPL",
             "tesla": "TSLA",
@@ -59,10 +215,7 @@ class AgentService:
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key or OpenAI is None:
             return None
-        try:  # pragma: no cover - creating the remote client is not unit tested
-            return OpenAI(api_key=api_key)
-        except Exception:
-            return None
+        return _shared_llm_client(api_key)
 
     def _today(self) -> dt.date:
         return dt.date.today()
@@ -73,13 +226,7 @@ class AgentService:
         return self._today()
 
     def _months_ago(self, reference: dt.date, months: int) -> dt.date:
-        year = reference.year
-        month = reference.month - months
-        while month <= 0:
-            month += 12
-            year -= 1
-        day = min(reference.day, calendar.monthrange(year, month)[1])
-        return dt.date(year, month, day)
+        return _months_ago(reference, months)
 
     def default_lookback(self, months: int = 12, end_date: dt.date | None = None) -> dt.date:
         reference = end_date or self.current_date()
@@ -90,7 +237,7 @@ class AgentService:
     # ------------------------------------------------------------------
     def _parse_tool_selection(self, text: str) -> Sequence[str]:
         try:
-            payload = json.loads(text)
+            payload = _json_loads(text)
         except json.JSONDecodeError:
             return []
         if isinstance(payload, dict) and "tools" in payload:
@@ -129,44 +276,42 @@ class AgentService:
 
     def _parse_numeric_token(self, token: str) -> int | None:
         cleaned = token.strip().lower()
-        if not cleaned:
-            return None
-        if cleaned.isdigit():
-            return int(cleaned)
-        if cleaned in _NUMBER_WORDS:
-            return _NUMBER_WORDS[cleaned]
-        if cleaned in {"half", "half-year", "half year"}:
-            return 6
-        return None
+        value = _NUMBER_WORDS.get(cleaned)
+        if value is not None:
+            return value
+        return int(cleaned) if cleaned.isdigit() else None
 
     def _subtract_period(self, end_date: dt.date, quantity: int, unit: str) -> dt.date | None:
         if quantity <= 0:
             return None
-        normalized = unit.lower()
-        if normalized.startswith("day") or normalized == "d":
+        # Callers pass lower-cased units; LLM payloads may still spell them oddly
+        # ("days_ago"), so anything off the table falls back to a prefix match.
+        kind = _PERIOD_UNITS.get(unit)
+        if kind is None:
+            kind = next(
+                (name for name in ("day", "week", "month", "year") if unit.startswith(name)), None
+            )
+        if kind == "day":
             return end_date - dt.timedelta(days=quantity)
-        if normalized.startswith("week") or normalized in {"w", "wk", "wks"}:
+        if kind == "week":
             return end_date - dt.timedelta(weeks=quantity)
-        if normalized.startswith("month") or normalized in {"m", "mo", "mos"}:
+        if kind == "month":
             return self._months_ago(end_date, quantity)
-        if normalized.startswith("year") or normalized in {"y", "yr", "yrs"}:
+        if kind == "year":
             return self._months_ago(end_date, quantity * 12)
         return None
 
     def _interpret_relative_window(
-        self, value: object, default_end: dt.date | None = None
+        self, value: object, default_end: dt.date | None = None, today: dt.date | None = None
     ) -> tuple[dt.date | None, dt.date | None]:
-        end_date = default_end or self._today()
+        end_date = default_end or today or self._today()
         quantity: int | None = None
         unit: str | None = None
         if isinstance(value, dict):
             quantity = self._parse_numeric_token(str(value.get("quantity", "")))
             unit = str(value.get("unit", "")).lower()
         elif isinstance(value, str):
-            match = re.search(
-                r"(?P<quantity>\d+|[a-z]+)\s*(?P<unit>years?|yrs?|y|months?|mos?|m|weeks?|wks?|w|days?|d)",
-                value.lower(),
-            )
+            match = _RELATIVE_WINDOW_RE.search(value.lower())
             if match:
                 quantity = self._parse_numeric_token(match.group("quantity"))
                 unit = match.group("unit")
@@ -177,136 +322,118 @@ class AgentService:
                 return start_date, end_date
         return None, default_end
 
-    def _extract_relative_period(self, query: str) -> tuple[dt.date | None, dt.date | None]:
-        lowered = query.lower()
-        today = self._today()
+    def _extract_relative_period(
+        self, lowered: str, today: dt.date | None = None
+    ) -> tuple[dt.date | None, dt.date | None]:
+        today = today or self._today()
 
-        english_match = re.search(
-            r"(?:past|last|trailing)\s+(?P<quantity>\d+|one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve|half)\s+(?P<unit>day|days|week|weeks|month|months|year|years)",
-            lowered,
-        )
-        if english_match:
-            quantity = self._parse_numeric_token(english_match.group("quantity"))
-            unit = english_match.group("unit")
-            if quantity and unit:
-                start = self._subtract_period(today, quantity, unit)
-                if start:
-                    return start, today
-
-        shorthand_match = re.search(r"(?P<quantity>\d+)(?P<unit>y|yr|yrs|m|mo|mos|w|wk|wks|d)", lowered)
-        if shorthand_match:
-            quantity = self._parse_numeric_token(shorthand_match.group("quantity"))
-            unit = shorthand_match.group("unit")
-            if quantity and unit:
-                start = self._subtract_period(today, quantity, unit)
-                if start:
-                    return start, today
-
-        if "last year" in lowered or "past year" in lowered:
+        first_matches: dict[str, re.Match[str]] = {}
+        for match in _RELATIVE_PERIOD_RE.finditer(lowered):
+            first_matches.setdefault(match.lastgroup, match)
+
+        for kind in ("english", "shorthand"):
+            match = first_matches.get(kind)
+            if match:
+                quantity = self._parse_numeric_token(match.group(f"{kind}_quantity"))
+                unit = match.group(f"{kind}_unit")
+                if quantity and unit:
+                    start = self._subtract_period(today, quantity, unit)
+                    if start:
+                        return start, today
+
+        if "year" in first_matches:
             start = self._subtract_period(today, 1, "year")
             if start:
                 return start, today
 
-        if "last half" in lowered or "past half" in lowered:
+        if "half" in first_matches:
             start = self._subtract_period(today, 6, "month")
             if start:
                 return start, today
 
         return None, None
 
-    def _extract_tickers(self, query: str) -> list[str]:
-        uppercase_words = re.findall(r"\b([A-Z]{1,5})\b", query)
-        tickers: list[str] = []
-        for word in uppercase_words:
-            if word.lower() in self._tool_map:
-                continue
-            tickers.append(word.upper())
+    def _extract_tickers(self, query: str, lowered: str) -> list[str]:
+        # Tokens are already upper-case by construction; only tool names are dropped.
+        tickers = [
+            word for word in _UPPERCASE_TOKEN_RE.findall(query) if word.lower() not in self._tool_map
+        ]
 
-        lowered = query.lower()
         for keyword, symbol in self._keyword_ticker_map.items():
             if keyword in lowered:
                 tickers.append(symbol)
         return list(dict.fromkeys(tickers))
 
-    def _keyword_plan(self, query: str) -> QueryPlan:
+    def _keyword_plan(
+        self, query: str, today: dt.date | None = None
+    ) -> tuple[QueryPlan, bool]:
+        """Build the heuristic plan and report whether keywords picked its tools."""
+
         lowered = query.lower()
-        tools: list[str] = []
-        for name in self._tool_map:
-            if name in lowered:
-                tools.append(name)
+        mentioned = set(self._tool_keyword_pattern.findall(lowered))
+        tools: list[str] = [name for name in self._tool_names if name in mentioned]
 
-        if not tools:
-            if "moving average" in lowered or "sma" in lowered:
-                tools.append("sma")
-            if "relative strength" in lowered or "rsi" in lowered:
-                tools.append("rsi")
-            if "z-score" in lowered or "z score" in lowered or "zscore" in lowered:
-                tools.append("zscore")
+        if not tools and mentioned:
+            aliased = {_TOOL_ALIASES[keyword] for keyword in mentioned}
+            tools = [name for name in _ALIAS_TOOL_ORDER if name in aliased]
 
+        tools_matched = bool(tools)
         if not tools:
-            tools = list(self._tool_map.keys())
+            tools = list(self._tool_names)
 
-        start_date, end_date = self._extract_relative_period(query)
-        tickers = self._extract_tickers(query)
+        start_date, end_date = self._extract_relative_period(lowered, today)
+        tickers = self._extract_tickers(query, lowered)
 
-        return QueryPlan(
-            tools=tuple(dict.fromkeys(tools)),
+        plan = QueryPlan(
+            tools=tuple(tools),
             tickers=tuple(tickers),
             start_date=start_date,
             end_date=end_date,
         )
+        return plan, tools_matched
 
-    def _resolve_tools(self, names: Sequence[str] | None) -> list[tuple[str, ToolFn]]:
+    @staticmethod
+    def _is_complete_plan(plan: QueryPlan, tools_matched: bool) -> bool:
+        # plan.tools is never empty (it falls back to every tool), so whether the
+        # query actually named an analysis has to come from the keyword match.
+        return bool(tools_matched and plan.tickers and plan.start_date and plan.end_date)
+
+    def _resolve_tools(self, names: Sequence[str] | None) -> Sequence[tuple[str, ToolFn]]:
         if not names:
-            return list(self._tool_map.items())
+            return self._all_tool_items
         resolved: list[tuple[str, ToolFn]] = []
         for name in names:
             tool = self._tool_map.get(name)
             if tool:
                 resolved.append((name, tool))
-        return resolved or list(self._tool_map.items())
-
-    def _interpret_with_llm(self, query: str) -> QueryPlan | None:
+        return resolved or self._all_tool_items
+
+    @staticmethod
+    def _extract_response_text(response: object) -> str:
+        text_parts: list[str] = []
+        for item in getattr(response, "output", ()):
+            for content in getattr(item, "content", ()):
+                if getattr(content, "type", None) == "output_text":
+                    text_parts.append(getattr(content, "text", ""))
+        if not text_parts and hasattr(response, "output_text"):
+            text_parts.append(getattr(response, "output_text"))
+        return "".join(text_parts).strip()
+
+    def _interpret_with_llm(self, query: str, today: dt.date | None = None) -> QueryPlan | None:
         if not self._llm_client:
             return None
 
-        prompt = textwrap.dedent(
-            f"""
-            You are a planning assistant for an investment statistics service.
-            Available analytics tools: {', '.join(self._tool_map.keys())}.
-            Respond with strict JSON shaped as:
-            {{
-                "tools": [tool_names...],
-                "tickers": [ticker_symbols...],
-                "start_date": "YYYY-MM-DD" | null,
-                "end_date": "YYYY-MM-DD" | null,
-                "lookback": {{"quantity": <int>, "unit": "day/week/month/year"}} | null
-            }}
-            - Tool names must come from the provided list only.
-            - Ticker symbols must be upper-case.
-            - Capture relative timeframes (e.g. "last six months") inside the lookback object.
-            - Set any unspecified field to null.
-            User query: "{query}".
-            """
-        ).strip()
+        prompt = _PLANNER_PROMPT_TEMPLATE.format(tools=self._tool_names_text, query=query)
 
         try:  # pragma: no cover - exercised via integration tests with a real client
             response = self._llm_client.responses.create(
-                model="gpt-5",
+                model=_LLM_MODEL,
                 input=[
                     {"role": "system", "content": "You extract structured plans for financial data analysis."},
                     {"role": "user", "content": prompt},
                 ],
             )
-            text_parts: list[str] = []
-            for item in getattr(response, "output", []):
-                for content in getattr(item, "content", []):
-                    if getattr(content, "type", None) == "output_text":
-                        text_parts.append(getattr(content, "text", ""))
-            if not text_parts and hasattr(response, "output_text"):
-                text_parts.append(getattr(response, "output_text"))
-            raw_text = "".join(text_parts).strip()
-            payload = json.loads(raw_text)
+            payload = _json_loads(self._extract_response_text(response))
         except Exception:
             return None
 
@@ -324,7 +451,9 @@ class AgentService:
         start_date = self._parse_date(payload.get("start_date"))
         end_date = self._parse_date(payload.get("end_date"))
         if payload.get("lookback") and not start_date:
-            start_date, inferred_end = self._interpret_relative_window(payload["lookback"], end_date)
+            start_date, inferred_end = self._interpret_relative_window(
+                payload["lookback"], end_date, today
+            )
             if inferred_end and not end_date:
                 end_date = inferred_end
 
@@ -338,49 +467,83 @@ class AgentService:
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
-    def interpret_query(self, query: str) -> QueryPlan:
-        heuristic_plan = self._keyword_plan(query)
-        llm_plan = self._interpret_with_llm(query)
-        if not llm_plan:
-            return heuristic_plan
-
-        tools = tuple(llm_plan.tools) if llm_plan.tools else heuristic_plan.tools
-        tickers = tuple(llm_plan.tickers) if llm_plan.tickers else heuristic_plan.tickers
-        start_date = llm_plan.start_date or heuristic_plan.start_date
-        end_date = llm_plan.end_date or heuristic_plan.end_date
-        return QueryPlan(tools=tools, tickers=tickers, start_date=start_date, end_date=end_date)
+    def interpret_query(self, query: str, force_llm: bool = False) -> QueryPlan:
+        # Plans are deterministic for a given query on a given day (relative windows
+        # are anchored to "today"), so repeats skip the heuristics and the LLM call.
+        today = self._today()
+        key = (query, today)
+        if not force_llm:
+            with self._cache_lock:
+                cached = self._plan_cache.get(key)
+                if cached is not None:
+                    self._plan_cache.move_to_end(key)
+                    return cached
+
+        heuristic_plan, tools_matched = self._keyword_plan(query, today)
+        if (
+            not force_llm
+            and self._fast_path
+            and self._is_complete_plan(heuristic_plan, tools_matched)
+        ):
+            # Nothing is left for the planner to fill in, so skip the round trip.
+            plan = heuristic_plan
+        else:
+            llm_plan = self._interpret_with_llm(query, today)
+            if llm_plan:
+                plan = QueryPlan(
+                    tools=tuple(llm_plan.tools) if llm_plan.tools else heuristic_plan.tools,
+                    tickers=tuple(llm_plan.tickers) if llm_plan.tickers else heuristic_plan.tickers,
+                    start_date=llm_plan.start_date or heuristic_plan.start_date,
+                    end_date=llm_plan.end_date or heuristic_plan.end_date,
+                )
+            elif self._llm_client:
+                # The LLM call failed; answer from the heuristics but retry next time.
+                return heuristic_plan
+            else:
+                plan = heuristic_plan
+
+        with self._cache_lock:
+            self._plan_cache[key] = plan
+            while len(self._plan_cache) > _PLAN_CACHE_SIZE:
+                self._plan_cache.popitem(last=False)
+        return plan
+
+    def clear_cache(self) -> None:
+        with self._cache_lock:
+            self._plan_cache.clear()
+            self._summary_cache.clear()
 
     def _generate_summary_with_llm(self, query: str, notes: dict[str, str]) -> str | None:
         if not self._llm_client:
             return None
+        cache_key = hashlib.sha256(
+            _json_dumps({"model": _LLM_MODEL, "query": query, "notes": notes}, sort_keys=True)
+        ).hexdigest()
+        if self._cache_summaries:
+            with self._cache_lock:
+                cached = self._summary_cache.get(cache_key)
+                if cached is not None:
+                    self._summary_cache.move_to_end(cache_key)
+                    return cached
         context = json.dumps(notes)
-        prompt = textwrap.dedent(
-            f"""
-            You are an investment analyst. Summarise the following tool outputs in a concise paragraph.
-            User query: {query}
-            Tool outputs (JSON): {context}
-            Provide actionable insights and mention notable divergences.
-            """
-        ).strip()
+        prompt = _SUMMARY_PROMPT_TEMPLATE.format(query=query, context=context)
         try:  # pragma: no cover - network call
             response = self._llm_client.responses.create(
-                model="gpt-5",
+                model=_LLM_MODEL,
                 input=[
                     {"role": "system", "content": "You craft succinct investment commentary."},
                     {"role": "user", "content": prompt},
                 ],
             )
-            text_parts: list[str] = []
-            for item in getattr(response, "output", []):
-                for content in getattr(item, "content", []):
-                    if getattr(content, "type", None) == "output_text":
-                        text_parts.append(getattr(content, "text", ""))
-            if not text_parts and hasattr(response, "output_text"):
-                text_parts.append(getattr(response, "output_text"))
-            combined = "".join(text_parts).strip()
-            return combined or None
+            combined = self._extract_response_text(response)
         except Exception:
             return None
+        if combined and self._cache_summaries:
+            with self._cache_lock:
+                self._summary_cache[cache_key] = combined
+                while len(self._summary_cache) > _SUMMARY_CACHE_SIZE:
+                    self._summary_cache.popitem(last=False)
+        return combined or None
 
     def run_analysis(
         self, query: str, data: PriceMatrix, plan: QueryPlan | None = None
@@ -390,8 +553,15 @@ class AgentService:
         aggregate_notes: dict[str, str] = {}
 
         tool_selection = self._resolve_tools(plan.tools if plan else None)
-        for name, tool in tool_selection:
-            result = tool(data)
+        if len(tool_selection) > 1:
+            # Tools only read the shared PriceMatrix, so they can run side by side;
+            # the first one runs here instead of leaving this thread idle.
+            (_, first_tool), *rest = tool_selection
+            futures = [_TOOL_POOL.submit(tool, data) for _, tool in rest]
+            results = [first_tool(data), *(future.result() for future in futures)]
+        else:
+            results = [tool(data) for _, tool in tool_selection]
+        for result in results:
             tool_summaries[result.name] = result.summary
             tool_images[result.name] = result.images
             aggregate_notes[result.name] = result.summary
@@ -5,7 +5,7 @@ from dataclasses import dataclass
 from typing import Dict, List, Sequence
 
 
-@dataclass
+@dataclass(slots=True)
 class ImagePayload:
     """Container representing an encoded image returned by a tool."""
 
@@ -21,21 +21,21 @@ class ImagePayload:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolResult:
     name: str
     summary: str
     images: List[ImagePayload]
 
 
-@dataclass
+@dataclass(slots=True)
 class AgentResult:
     summary: str
     tool_summaries: Dict[str, str]
     tool_images: Dict[str, List[ImagePayload]]
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class QueryPlan:
     """Structured interpretation of a natural language analysis request."""
 
@@ -1,21 +1,27 @@
 from __future__ import annotations
 
+import codecs
 import csv
 import datetime as dt
 import io
 import re
-from dataclasses import dataclass
-from typing import Dict, Iterable, List, Sequence
+import sys
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from itertools import chain
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Sequence, TextIO
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PriceMatrix:
     dates: List[dt.date]
     series: Dict[str, List[float]]
+    # Every tool reads the ticker axis from the same shared matrix, so it is built
+    # once here (as an immutable tuple) instead of on each access.
+    tickers: tuple[str, ...] = field(init=False, repr=False, compare=False)
 
-    @property
-    def tickers(self) -> List[str]:
-        return list(self.series.keys())
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "tickers", tuple(self.series))
 
     def is_empty(self) -> bool:
         return not self.dates or not self.series
@@ -26,6 +32,10 @@ RawRecord = Dict[str, object]
 
 def clean_stock_data(records: Iterable[RawRecord]) -> PriceMatrix:
     normalized: List[tuple[dt.date, str, float]] = []
+    # Each ticker repeats once per date; normalise and intern it once per distinct value.
+    ticker_cache: Dict[object, str] = {}
+    # Likewise each date string repeats once per ticker.
+    date_cache: Dict[str, dt.date] = {}
     for row in records:
         try:
             date_value = row.get("Date") or row.get("date")
@@ -37,9 +47,20 @@ def clean_stock_data(records: Iterable[RawRecord]) -> PriceMatrix:
                 date = date_value.date()
             elif isinstance(date_value, dt.date):
                 date = date_value
+            elif isinstance(date_value, str):
+                date = date_cache.get(date_value)
+                if date is None:
+                    try:
+                        date = dt.date.fromisoformat(date_value)
+                    except ValueError:
+                        # ISO timestamps: keep the calendar date of a valid timestamp.
+                        date = dt.datetime.fromisoformat(date_value).date()
+                    date_cache[date_value] = date
             else:
                 date = dt.date.fromisoformat(str(date_value))
-            ticker = str(ticker_value).upper()
+            ticker = ticker_cache.get(ticker_value)
+            if ticker is None:
+                ticker = ticker_cache[ticker_value] = sys.intern(str(ticker_value).upper())
             price = float(close_value)
             normalized.append((date, ticker, price))
         except Exception:
@@ -48,38 +69,45 @@ def clean_stock_data(records: Iterable[RawRecord]) -> PriceMatrix:
     if not normalized:
         return PriceMatrix(dates=[], series={})
 
-    normalized.sort(key=lambda item: (item[0], item[1]))
+    # No row-level sort is needed: the axes are sorted on their own and prices are
+    # scattered by index, so a repeated (date, ticker) still keeps its last row.
     tickers = sorted({item[1] for item in normalized})
-    date_map: Dict[dt.date, Dict[str, float]] = {}
-    for date, ticker, price in normalized:
-        date_map.setdefault(date, {})[ticker] = price
-
-    sorted_dates = sorted(date_map.keys())
-    filled_series: Dict[str, List[float]] = {ticker: [] for ticker in tickers}
-    latest_values: Dict[str, float | None] = {ticker: None for ticker in tickers}
-
-    for current_date in sorted_dates:
-        for ticker in tickers:
-            if ticker in date_map[current_date]:
-                latest_values[ticker] = date_map[current_date][ticker]
-            filled_series[ticker].append(latest_values[ticker])
-
-    valid_indices: List[int] = []
-    for idx in range(len(sorted_dates)):
-        if all(filled_series[ticker][idx] is not None for ticker in tickers):
-            valid_indices.append(idx)
-
-    filtered_dates = [sorted_dates[idx] for idx in valid_indices]
-    filtered_series = {
-        ticker: [filled_series[ticker][idx] for idx in valid_indices] for ticker in tickers
+    sorted_dates = sorted({item[0] for item in normalized})
+    date_index = {date: idx for idx, date in enumerate(sorted_dates)}
+
+    # Scatter prices straight into one column per ticker, aligned on the date axis.
+    columns: Dict[str, List[float | None]] = {
+        ticker: [None] * len(sorted_dates) for ticker in tickers
     }
+    for date, ticker, price in normalized:
+        columns[ticker][date_index[date]] = price
+
+    # After forward-filling, every row from the latest first observation onwards is
+    # complete, so dropping incomplete rows reduces to slicing off a common prefix.
+    first_complete = 0
+    for column in columns.values():
+        first_observed = next(idx for idx, value in enumerate(column) if value is not None)
+        latest = column[first_observed]
+        for idx in range(first_observed + 1, len(column)):
+            value = column[idx]
+            if value is None:
+                column[idx] = latest
+            else:
+                latest = value
+        first_complete = max(first_complete, first_observed)
+
+    filtered_dates = sorted_dates[first_complete:]
+    filtered_series = {ticker: column[first_complete:] for ticker, column in columns.items()}
 
     return PriceMatrix(dates=filtered_dates, series=filtered_series)
 
 
+_NON_ALNUM_RE = re.compile(r"[^A-Za-z0-9]+")
+
+
 def _derive_ticker_from_filename(filename: str) -> str | None:
     stem = filename.rsplit(".", 1)[0]
-    candidate = re.sub(r"[^A-Za-z0-9]+", "", stem)
+    candidate = _NON_ALNUM_RE.sub("", stem)
     return candidate.upper() if candidate else None
 
 
@@ -158,27 +186,21 @@ def _parse_matrix_layout(
     return parsed
 
 
-def parse_uploaded_prices(
-    content: bytes,
-    filename: str | None = None,
-    fallback_tickers: Sequence[str] | None = None,
-) -> List[RawRecord]:
-    if not content:
-        return []
+@contextmanager
+def _text_stream(fileobj: BinaryIO, encoding: str, errors: str) -> Iterator[TextIO]:
+    """Decode ``fileobj`` from the start without taking ownership of it."""
 
+    fileobj.seek(0)
+    stream = io.TextIOWrapper(fileobj, encoding=encoding, errors=errors, newline="")
     try:
-        text = content.decode("utf-8-sig")
-    except UnicodeDecodeError:
-        text = content.decode("latin-1", errors="ignore")
+        yield stream
+    finally:
+        stream.detach()
 
-    dialect = csv.excel
-    if text.strip():
-        sample = "\n".join(text.splitlines()[:2])
-        try:
-            dialect = csv.Sniffer().sniff(sample)
-        except Exception:
-            pass
-    reader = csv.DictReader(io.StringIO(text), dialect=dialect)
+
+def _resolve_fallback_symbol(
+    filename: str | None, fallback_tickers: Sequence[str] | None
+) -> str | None:
     fallback_symbols = [
         str(symbol).strip().upper()
         for symbol in (fallback_tickers or [])
@@ -187,66 +209,161 @@ def parse_uploaded_prices(
     fallback_symbol = fallback_symbols[0] if fallback_symbols else None
     if not fallback_symbol and filename:
         fallback_symbol = _derive_ticker_from_filename(filename)
-    records: List[RawRecord] = []
-    auto_symbol: str | None = fallback_symbol
-    for row in reader:
-        date_value = row.get("Date") or row.get("date")
-        ticker_value = (
-            row.get("Ticker")
-            or row.get("ticker")
-            or row.get("Symbol")
-            or row.get("symbol")
-            or auto_symbol
-        )
-        close_value = row.get("Close") or row.get("close") or row.get("Adj Close")
-        if not date_value or close_value in (None, ""):
-            continue
-        if not ticker_value:
-            if auto_symbol is None:
-                auto_symbol = "UPLOAD"
-            ticker_value = auto_symbol
-        records.append(
-            {
-                "Date": date_value,
-                "Ticker": str(ticker_value).strip().upper(),
-                "Close": close_value,
-            }
-        )
-
-    if records:
-        return records
-
-    structured_rows = list(csv.reader(io.StringIO(text)))
-    matrix_records = _parse_matrix_layout(structured_rows, fallback_symbol)
+    return fallback_symbol
+
+
+# A comma-separated sample without any of these is plain csv.excel, so sniffing
+# (slow, and it only ever confirms the default) can be skipped.
+_SNIFF_HINTS = "\t;| \"'"
+
+# Header names tried, in order, for each field of a long-format CSV upload.
+_DATE_COLUMNS = ("Date", "date")
+_TICKER_COLUMNS = ("Ticker", "ticker", "Symbol", "symbol")
+_CLOSE_COLUMNS = ("Close", "close", "Adj Close")
+
+
+def _column_indices(header: Sequence[str], names: Sequence[str]) -> tuple[int, ...]:
+    # Like DictReader, a repeated header name refers to its last column.
+    positions = {name: idx for idx, name in enumerate(header)}
+    return tuple(positions[name] for name in names if name in positions)
+
+
+def _is_utf8(fileobj: BinaryIO, chunk_size: int = 1 << 20) -> bool:
+    """Validate the whole stream as UTF-8 without holding more than one chunk."""
+
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    fileobj.seek(0)
+    try:
+        for chunk in iter(lambda: fileobj.read(chunk_size), b""):
+            decoder.decode(chunk)
+        decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def _iter_text_stream(
+    fileobj: BinaryIO,
+    filename: str | None,
+    fallback_symbol: str | None,
+    encoding: str,
+    errors: str,
+) -> Iterator[RawRecord]:
+    produced = False
+    with _text_stream(fileobj, encoding, errors) as stream:
+        head = [line for line in (stream.readline(), stream.readline()) if line]
+        sample = "\n".join(line.rstrip("\r\n") for line in head)
+        dialect = csv.excel
+        if sample.strip() and ("," not in sample or any(ch in sample for ch in _SNIFF_HINTS)):
+            try:
+                dialect = csv.Sniffer().sniff(sample)
+            except Exception:
+                pass
+        reader = csv.reader(chain(head, stream), dialect=dialect)
+        header = next(reader, None) or []
+        date_columns = _column_indices(header, _DATE_COLUMNS)
+        ticker_columns = _column_indices(header, _TICKER_COLUMNS)
+        close_columns = _column_indices(header, _CLOSE_COLUMNS)
+        width = len(header)
+        auto_symbol: str | None = fallback_symbol
+        symbol_cache: Dict[str, str] = {}
+        for row in reader:
+            if not row:
+                continue
+            if len(row) < width:
+                # Short rows behave like DictReader's missing (falsy) values.
+                row += [""] * (width - len(row))
+            date_value = ticker_value = close_value = ""
+            for idx in date_columns:
+                date_value = row[idx]
+                if date_value:
+                    break
+            for idx in ticker_columns:
+                ticker_value = row[idx]
+                if ticker_value:
+                    break
+            ticker_value = ticker_value or auto_symbol
+            for idx in close_columns:
+                close_value = row[idx]
+                if close_value:
+                    break
+            if not date_value or close_value in (None, ""):
+                continue
+            if not ticker_value:
+                if auto_symbol is None:
+                    auto_symbol = "UPLOAD"
+                ticker_value = auto_symbol
+            symbol = symbol_cache.get(ticker_value)
+            if symbol is None:
+                symbol = symbol_cache[ticker_value] = sys.intern(ticker_value.strip().upper())
+            produced = True
+            yield {"Date": date_value, "Ticker": symbol, "Close": close_value}
+
+    if produced:
+        return
+
+    with _text_stream(fileobj, encoding, errors) as stream:
+        matrix_records = _parse_matrix_layout(list(csv.reader(stream)), fallback_symbol)
     if matrix_records:
-        return matrix_records
+        yield from matrix_records
+        return
 
     if filename and filename.lower().endswith(".json"):
         try:
             import json
 
-            parsed = json.loads(text)
-            if isinstance(parsed, list):
-                for item in parsed:
-                    if isinstance(item, dict):
-                        date_value = item.get("Date") or item.get("date")
-                        ticker_value = (
-                            item.get("Ticker")
-                            or item.get("ticker")
-                            or item.get("Symbol")
-                            or item.get("symbol")
-                            or fallback_symbol
-                        )
-                        close_value = item.get("Close") or item.get("close")
-                        if date_value and ticker_value and close_value is not None:
-                            records.append(
-                                {
-                                    "Date": date_value,
-                                    "Ticker": str(ticker_value).strip().upper(),
-                                    "Close": close_value,
-                                }
-                            )
+            with _text_stream(fileobj, encoding, errors) as stream:
+                parsed = json.load(stream)
         except Exception:
-            return []
+            return
+        if isinstance(parsed, list):
+            for item in parsed:
+                if isinstance(item, dict):
+                    date_value = item.get("Date") or item.get("date")
+                    ticker_value = (
+                        item.get("Ticker")
+                        or item.get("ticker")
+                        or item.get("Symbol")
+                        or item.get("symbol")
+                        or fallback_symbol
+                    )
+                    close_value = item.get("Close") or item.get("close")
+                    if date_value and ticker_value and close_value is not None:
+                        yield {
+                            "Date": date_value,
+                            "Ticker": str(ticker_value).strip().upper(),
+                            "Close": close_value,
+                        }
+
+
+def iter_uploaded_prices(
+    fileobj: BinaryIO,
+    filename: str | None = None,
+    fallback_tickers: Sequence[str] | None = None,
+) -> Iterator[RawRecord]:
+    """Lazily yield records from an uploaded price file.
+
+    Records are produced row by row so they can be fed straight into
+    :func:`clean_stock_data` without building an intermediate list. The
+    encoding is settled before the first record is yielded, since a decode
+    error cannot be retried halfway through the stream. ``fileobj`` must be
+    seekable; it is rewound for the matrix and JSON fallbacks and left open for
+    the caller.
+    """
+
+    fallback_symbol = _resolve_fallback_symbol(filename, fallback_tickers)
+    if _is_utf8(fileobj):
+        encoding, errors = "utf-8-sig", "strict"
+    else:
+        encoding, errors = "latin-1", "ignore"
+    yield from _iter_text_stream(fileobj, filename, fallback_symbol, encoding, errors)
+
+
+def parse_uploaded_prices(
+    content: bytes,
+    filename: str | None = None,
+    fallback_tickers: Sequence[str] | None = None,
+) -> List[RawRecord]:
+    """Parse an in-memory upload, materialising every record into a list."""
 
-    return records
+    return list(iter_uploaded_prices(io.BytesIO(content), filename, fallback_tickers))
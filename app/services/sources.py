@@ -1,7 +1,10 @@
 from __future__ import annotations
 
 import datetime as dt
-from typing import Iterable, List
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, List, Optional
 
 try:
     import yfinance as yf  # type: ignore
@@ -9,15 +12,53 @@ except ImportError:  # pragma: no cover - optional dependency
     yf = None
 
 
+MarketRecord = dict[str, object]
+_CacheKey = tuple[tuple[str, ...], Optional[dt.date], Optional[dt.date]]
+
+# Downloads are cached in-process so repeated questions about the same tickers and
+# window skip the network round-trip. Entries expire after a few hours so that
+# intraday requests still pick up new closes.
+_CACHE_TTL_SECONDS = 4 * 60 * 60
+_CACHE_MAX_ENTRIES = 256
+_cache: OrderedDict[_CacheKey, tuple[float, List[MarketRecord]]] = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def clear_market_data_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
+
+
 def load_market_data(
     tickers: Iterable[str],
     start: dt.date | None = None,
     end: dt.date | None = None,
-) -> List[dict[str, object]]:
+) -> List[MarketRecord]:
     symbols = [ticker.upper() for ticker in tickers]
     if not symbols or yf is None:
         return []
 
+    key: _CacheKey = (tuple(sorted(set(symbols))), start, end)
+    now = time.monotonic()
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is not None and now - entry[0] < _CACHE_TTL_SECONDS:
+            _cache.move_to_end(key)
+            return list(entry[1])
+
+    records = _download_market_data(symbols, start, end)
+    if records:
+        with _cache_lock:
+            _cache[key] = (now, records)
+            _cache.move_to_end(key)
+            while len(_cache) > _CACHE_MAX_ENTRIES:
+                _cache.popitem(last=False)
+    return list(records)
+
+
+def _download_market_data(
+    symbols: List[str], start: dt.date | None, end: dt.date | None
+) -> List[MarketRecord]:
     data = yf.download(
         tickers=symbols,
         start=start.isoformat() if start else None,
@@ -27,22 +68,31 @@ def load_market_data(
         group_by="ticker",
     )
 
-    records: List[dict[str, object]] = []
-    if hasattr(data, "columns") and getattr(data, "columns", None) is not None:
-        columns = getattr(data, "columns")
-        if getattr(columns, "nlevels", 1) == 2:
-            for ticker in symbols:
-                try:
-                    close_series = data[("Close", ticker)]
-                except KeyError:
-                    continue
-                for date, value in close_series.dropna().items():
-                    records.append({"Date": date.date(), "Ticker": ticker, "Close": float(value)})
-            return records
-        if "Close" in columns:
-            close_series = data["Close"].dropna()
-            ticker = symbols[0]
-            for date, value in close_series.items():
-                records.append({"Date": date.date(), "Ticker": ticker, "Close": float(value)})
+    records: List[MarketRecord] = []
+    columns = getattr(data, "columns", None)
+    if columns is None:
+        return records
+    if getattr(columns, "nlevels", 1) == 2:
+        # group_by="ticker" puts the symbol on the outer level (ticker, field); older
+        # yfinance releases use (field, ticker). Slice out the Close columns either way.
+        if "Close" in columns.get_level_values(0):
+            closes = data.xs("Close", axis=1, level=0)
+        elif "Close" in columns.get_level_values(1):
+            closes = data.xs("Close", axis=1, level=1)
+        else:
             return records
+        close_columns = [(ticker, closes[ticker]) for ticker in symbols if ticker in closes.columns]
+    elif "Close" in columns:
+        close_columns = [(symbols[0], data["Close"])]
+    else:
+        return records
+
+    for ticker, close_series in close_columns:
+        close_series = close_series.dropna()
+        # Convert the index and values in bulk rather than boxing a Timestamp and a
+        # numpy scalar for every row.
+        records.extend(
+            {"Date": date, "Ticker": ticker, "Close": value}
+            for date, value in zip(close_series.index.date, close_series.tolist())
+        )
     return records
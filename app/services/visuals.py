@@ -1,26 +1,21 @@
 from __future__ import annotations
 
-import base64
 import io
 import os
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import date, datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Iterable, Mapping, Sequence
+from typing import Any, Iterable, Mapping, Sequence
 from uuid import uuid4
 
 from app.services.models import ImagePayload
 
-try:  # pragma: no cover - matplotlib optional during testing
-    import matplotlib
-
-    matplotlib.use("Agg")
-    import matplotlib.dates as mdates
-    import matplotlib.pyplot as plt
-except ImportError:  # pragma: no cover - fallback when matplotlib missing
-    matplotlib = None  # type: ignore[assignment]
-    plt = None  # type: ignore[assignment]
-    mdates = None  # type: ignore[assignment]
+try:  # pragma: no cover - SIMD-accelerated encoder when installed
+    from pybase64 import b64encode
+except ImportError:  # pragma: no cover - stdlib fallback
+    from base64 import b64encode
 
 try:  # pragma: no cover - optional dependency in tests
     from azure.storage.blob import BlobServiceClient, ContentSettings
@@ -28,6 +23,14 @@ except ImportError:  # pragma: no cover - optional dependency in tests
     BlobServiceClient = None  # type: ignore[assignment]
     ContentSettings = None  # type: ignore[assignment]
 
+# Chart uploads from every tool share these threads, so upload concurrency stays
+# bounded however many analyses are in flight.
+_UPLOAD_WORKERS = 8
+_UPLOAD_POOL = ThreadPoolExecutor(max_workers=_UPLOAD_WORKERS, thread_name_prefix="chart-upload")
+
+# Heatmaps with more tickers than this are drawn without per-cell value labels.
+_HEATMAP_ANNOTATION_LIMIT = 20
+
 
 @dataclass(slots=True)
 class VisualConfig:
@@ -44,14 +47,46 @@ class VisualConfig:
         )
 
 
+@lru_cache(maxsize=1)
+def _matplotlib() -> tuple[Any, Any, Any] | None:
+    """Import matplotlib on first use rather than at application start-up.
+
+    Importing it accounts for most of the service's cold-start time, and the
+    app can serve requests that never draw a chart.
+    """
+
+    try:  # pragma: no cover - matplotlib optional during testing
+        import matplotlib.dates as mdates
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+    except ImportError:  # pragma: no cover - fallback when matplotlib missing
+        return None
+    return Figure, FigureCanvasAgg, mdates
+
+
+def _new_figure(figsize: tuple[float, float]):
+    # Figures are bound straight to an Agg canvas instead of going through pyplot,
+    # whose global figure registry is not safe to use from concurrent tools.
+    Figure, FigureCanvasAgg, _ = _matplotlib()
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig, fig.add_subplot()
+
+
 def _figure_to_png_bytes(fig) -> bytes:
-    if plt is None or not hasattr(fig, "savefig"):
+    if not hasattr(fig, "savefig"):
         raise RuntimeError("Matplotlib is not available")
     buffer = io.BytesIO()
-    fig.savefig(buffer, format="png", bbox_inches="tight", facecolor="white")
-    plt.close(fig)
-    buffer.seek(0)
-    return buffer.read()
+    # Both plot builders already call tight_layout, so skip the extra bbox pass.
+    fig.savefig(buffer, format="png", facecolor="white")
+    return buffer.getvalue()
+
+
+@lru_cache(maxsize=4)
+def _blob_service(connection_string: str):
+    # Reused across uploads so each chart does not pay for a new HTTPS session;
+    # the Azure SDK clients are safe to share between threads.
+    return BlobServiceClient.from_connection_string(connection_string)
 
 
 def _upload_to_azure(content: bytes, config: VisualConfig) -> str | None:
@@ -60,8 +95,7 @@ def _upload_to_azure(content: bytes, config: VisualConfig) -> str | None:
     if BlobServiceClient is None:
         return None
 
-    blob_service = BlobServiceClient.from_connection_string(config.connection_string)
-    blob_client = blob_service.get_blob_client(
+    blob_client = _blob_service(config.connection_string).get_blob_client(
         container=config.container_name,
         blob=f"analysis/{os.urandom(8).hex()}.png",
     )
@@ -89,56 +123,102 @@ def _store_local(content: bytes, static_base_url: str | None) -> str | None:
     return relative_path
 
 
-def figure_to_payload(fig, config: VisualConfig | None = None) -> ImagePayload:
-    cfg = config or VisualConfig.from_env()
-    if plt is None or not hasattr(fig, "savefig"):
-        text = getattr(fig, "payload", "Chart unavailable")
-        encoded = base64.b64encode(str(text).encode("utf-8")).decode("ascii")
-        return ImagePayload(content_type="text/plain", encoding="base64", data=encoded)
-    png_bytes = _figure_to_png_bytes(fig)
+def _text_payload(fig) -> ImagePayload:
+    text = getattr(fig, "payload", "Chart unavailable")
+    encoded = b64encode(str(text).encode("utf-8")).decode("ascii")
+    return ImagePayload(content_type="text/plain", encoding="base64", data=encoded)
+
+
+def _png_payload(png_bytes: bytes, cfg: VisualConfig) -> ImagePayload:
     azure_url = _upload_to_azure(png_bytes, cfg)
     if azure_url:
         return ImagePayload(content_type="image/png", encoding="url", data=azure_url)
     local_url = _store_local(png_bytes, cfg.static_base_url)
     if local_url:
         return ImagePayload(content_type="image/png", encoding="url", data=local_url)
-    encoded_png = base64.b64encode(png_bytes).decode("ascii")
+    encoded_png = b64encode(png_bytes).decode("ascii")
     return ImagePayload(content_type="image/png", encoding="base64", data=encoded_png)
 
 
+def figure_to_payload(fig, config: VisualConfig | None = None) -> ImagePayload:
+    cfg = config or VisualConfig.from_env()
+    if not hasattr(fig, "savefig"):
+        return _text_payload(fig)
+    return _png_payload(_figure_to_png_bytes(fig), cfg)
+
+
+class PayloadBatch:
+    """Collect the image payloads produced by one tool call.
+
+    Each figure is rendered to PNG as soon as it is added, so only its bytes
+    outlive the call. With Azure configured, the upload starts right away on
+    the shared upload pool and overlaps with drawing the next chart; otherwise
+    the payload is built inline.
+    """
+
+    __slots__ = ("_config", "_uploads", "_items")
+
+    def __init__(self, config: VisualConfig | None = None) -> None:
+        self._config = config or VisualConfig.from_env()
+        self._uploads = bool(
+            self._config.connection_string
+            and self._config.container_name
+            and BlobServiceClient is not None
+        )
+        self._items: list[ImagePayload | Future[ImagePayload]] = []
+
+    def add(self, fig) -> None:
+        if not hasattr(fig, "savefig"):
+            self._items.append(_text_payload(fig))
+            return
+        png_bytes = _figure_to_png_bytes(fig)
+        if self._uploads:
+            self._items.append(_UPLOAD_POOL.submit(_png_payload, png_bytes, self._config))
+        else:
+            self._items.append(_png_payload(png_bytes, self._config))
+
+    def payloads(self) -> list[ImagePayload]:
+        """Return the payloads in the order their figures were added."""
+
+        return [item.result() if isinstance(item, Future) else item for item in self._items]
+
+
 def plot_heatmap(matrix: Sequence[Sequence[float]], labels: Sequence[str], title: str):
-    if plt is None:  # pragma: no cover - fallback text output when matplotlib missing
+    if _matplotlib() is None:  # pragma: no cover - fallback text output when matplotlib missing
         return type("DummyFigure", (), {"payload": f"{title}: heatmap unavailable"})()
-    fig, ax = plt.subplots(figsize=(0.6 * max(len(labels), 1) + 3, 0.6 * max(len(labels), 1) + 3))
+    fig, ax = _new_figure((0.6 * max(len(labels), 1) + 3, 0.6 * max(len(labels), 1) + 3))
     heatmap = ax.imshow(matrix, cmap="RdBu_r")
     ax.set_title(title)
     ax.set_xticks(range(len(labels)))
     ax.set_xticklabels(labels, rotation=45, ha="right")
     ax.set_yticks(range(len(labels)))
     ax.set_yticklabels(labels)
-    for i, row in enumerate(matrix):
-        for j, value in enumerate(row):
-            ax.text(j, i, f"{value:.2f}", va="center", ha="center", color="black")
+    # One text artist per cell is the dominant cost on large matrices, and the
+    # numbers stop being legible long before then anyway.
+    if len(labels) <= _HEATMAP_ANNOTATION_LIMIT:
+        for i, row in enumerate(matrix):
+            for j, value in enumerate(row):
+                ax.text(j, i, f"{value:.2f}", va="center", ha="center", color="black")
     fig.colorbar(heatmap, ax=ax, fraction=0.046, pad=0.04)
     fig.tight_layout()
     return fig
 
 
 def plot_lines(
-    dates: Sequence[str],
+    dates: Sequence[str | date],
     series_map: Mapping[str, Sequence[float]],
     title: str,
     y_label: str,
     horizontal_lines: Iterable[tuple[float, str]] | None = None,
 ):
-    if plt is None:  # pragma: no cover - fallback text output when matplotlib missing
+    if _matplotlib() is None:  # pragma: no cover - fallback text output when matplotlib missing
         readable = ", ".join(f"{label}" for label in series_map.keys())
         return type(
             "DummyFigure",
             (),
             {"payload": f"{title}: {readable} (plot unavailable)"},
         )()
-    fig, ax = plt.subplots(figsize=(10, 4))
+    fig, ax = _new_figure((10, 4))
     plotted_dates: Sequence[object] = list(dates)
     use_date_formatting = False
     if dates:
@@ -163,7 +243,8 @@ def plot_lines(
             ax.axhline(y=value, color=color, linestyle="--", linewidth=1)
     if len(series_map) > 1:
         ax.legend()
-    if use_date_formatting and mdates is not None:
+    if use_date_formatting:
+        mdates = _matplotlib()[2]
         locator = mdates.AutoDateLocator()
         formatter = mdates.ConciseDateFormatter(locator)
         ax.xaxis.set_major_locator(locator)
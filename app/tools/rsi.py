@@ -11,24 +11,25 @@ def _compute_rsi(prices: List[float], period: int = 14) -> List[float]:
     if len(prices) < 2:
         return [50.0 for _ in prices]
 
-    deltas = [prices[i] - prices[i - 1] for i in range(1, len(prices))]
-    gains = [max(delta, 0.0) for delta in deltas]
-    losses = [abs(min(delta, 0.0)) for delta in deltas]
-
-    avg_gain = gains[0] if gains else 0.0
-    avg_loss = losses[0] if losses else 0.0
+    # Wilder smoothing is a recurrence, so it stays a loop; deltas, gains and
+    # losses are derived on the fly instead of being materialised as lists.
+    first_delta = prices[1] - prices[0]
+    avg_gain = first_delta if first_delta > 0 else 0.0
+    avg_loss = -first_delta if first_delta < 0 else 0.0
+    decay = period - 1
     rsi_values = [50.0] * len(prices)
 
+    previous = prices[0]
     for i in range(1, len(prices)):
-        gain = gains[i - 1] if i - 1 < len(gains) else 0.0
-        loss = losses[i - 1] if i - 1 < len(losses) else 0.0
-        avg_gain = ((period - 1) * avg_gain + gain) / period
-        avg_loss = ((period - 1) * avg_loss + loss) / period
+        current = prices[i]
+        delta = current - previous
+        previous = current
+        avg_gain = (decay * avg_gain + (delta if delta > 0 else 0.0)) / period
+        avg_loss = (decay * avg_loss + (-delta if delta < 0 else 0.0)) / period
         if avg_loss == 0:
-            rs = float("inf")
+            rsi_values[i] = 100.0
         else:
-            rs = avg_gain / avg_loss
-        rsi_values[i] = 100 - (100 / (1 + rs)) if rs != float("inf") else 100.0
+            rsi_values[i] = 100 - (100 / (1 + avg_gain / avg_loss))
 
     return rsi_values
 
@@ -54,7 +55,7 @@ def analyze_rsi(data: PriceMatrix, period: int = 14) -> ToolResult:
         series_map[ticker] = rsi_values
 
     figure = plot_lines(
-        dates=[date.isoformat() for date in data.dates],
+        dates=data.dates,
         series_map=series_map,
         title=f"{period}-Period RSI",
         y_label="RSI",
@@ -1,19 +1,19 @@
 from __future__ import annotations
 
+from itertools import accumulate
 from typing import List
 
-from app.services.models import ImagePayload, ToolResult
+from app.services.models import ToolResult
 from app.services.preprocess import PriceMatrix
-from app.services.visuals import figure_to_payload, plot_lines
+from app.services.visuals import PayloadBatch, plot_lines
 
 
-def _simple_moving_average(values: List[float], window: int) -> List[float]:
-    averages: List[float] = []
-    for idx in range(len(values)):
-        start = max(0, idx - window + 1)
-        window_values = values[start : idx + 1]
-        averages.append(sum(window_values) / len(window_values))
-    return averages
+def _rolling_mean(prefix: List[float], window: int) -> List[float]:
+    # Prefix sums turn every window into a single subtraction: O(n) instead of O(n * window).
+    return [
+        (prefix[idx + 1] - prefix[max(0, idx - window + 1)]) / min(idx + 1, window)
+        for idx in range(len(prefix) - 1)
+    ]
 
 
 def analyze_sma(data: PriceMatrix, windows: tuple[int, int] = (20, 50)) -> ToolResult:
@@ -22,15 +22,17 @@ def analyze_sma(data: PriceMatrix, windows: tuple[int, int] = (20, 50)) -> ToolR
 
     short_window, long_window = windows
     summaries: list[str] = []
-    images: list[ImagePayload] = []
+    charts = PayloadBatch()
 
     for ticker in data.tickers:
         prices = data.series[ticker]
-        short_ma = _simple_moving_average(prices, short_window)
-        long_ma = _simple_moving_average(prices, long_window)
+        # Both windows are read off the same prefix sum.
+        prefix = [0.0, *accumulate(prices)]
+        short_ma = _rolling_mean(prefix, short_window)
+        long_ma = _rolling_mean(prefix, long_window)
 
         figure = plot_lines(
-            dates=[date.isoformat() for date in data.dates],
+            dates=data.dates,
             series_map={
                 f"{ticker} Close": prices,
                 f"SMA {short_window}": short_ma,
@@ -39,7 +41,7 @@ def analyze_sma(data: PriceMatrix, windows: tuple[int, int] = (20, 50)) -> ToolR
             title=f"{ticker} Close with SMAs",
             y_label="Price",
         )
-        images.append(figure_to_payload(figure))
+        charts.add(figure)
 
         if short_ma[-1] > long_ma[-1]:
             summaries.append(f"{ticker}: bullish crossover ({short_window}>{long_window}).")
@@ -49,4 +51,4 @@ def analyze_sma(data: PriceMatrix, windows: tuple[int, int] = (20, 50)) -> ToolR
             summaries.append(f"{ticker}: SMAs aligned.")
 
     summary = " ".join(summaries)
-    return ToolResult(name="sma", summary=summary, images=images)
+    return ToolResult(name="sma", summary=summary, images=charts.payloads())
@@ -1,12 +1,10 @@
 from __future__ import annotations
 
-from itertools import combinations
-from statistics import mean, pstdev
-from typing import List
+from math import fsum, sqrt
 
 from app.services.models import ToolResult
 from app.services.preprocess import PriceMatrix
-from app.services.visuals import figure_to_payload, plot_heatmap, plot_lines
+from app.services.visuals import PayloadBatch, plot_heatmap, plot_lines
 
 
 def analyze_zscore(data: PriceMatrix) -> ToolResult:
@@ -18,59 +16,65 @@ def analyze_zscore(data: PriceMatrix) -> ToolResult:
             images=[],
         )
 
-    latest_scores: dict[tuple[str, str], float] = {}
-    zscore_history: dict[tuple[str, str], List[float]] = {}
+    count = len(data.dates)
+    size = len(tickers)
+    columns = [data.series[ticker] for ticker in tickers]
+    matrix = [[0.0 for _ in tickers] for _ in tickers]
+    # (row, column, mean, std) of the pair with the largest |latest z-score|.
+    extreme: tuple[int, int, float, float] | None = None
+    extreme_score = 0.0
 
-    for left, right in combinations(tickers, 2):
-        left_series = data.series[left]
-        right_series = data.series[right]
-        spread = [l - r for l, r in zip(left_series, right_series)]
-        spread_std = pstdev(spread)
-        if spread_std == 0:
-            continue
-        spread_mean = mean(spread)
-        z_values = [(value - spread_mean) / spread_std for value in spread]
-        latest_scores[(left, right)] = z_values[-1]
-        zscore_history[(left, right)] = z_values
+    # Only the latest z-score of each pair is needed for the heatmap; the full
+    # history is rebuilt below for the single pair that gets charted.
+    for i in range(size):
+        left_series = columns[i]
+        for j in range(i + 1, size):
+            spread = [l - r for l, r in zip(left_series, columns[j])]
+            # statistics.pstdev works in exact fractions and dominates the runtime.
+            # With fsum, a constant spread must be caught explicitly so rounding
+            # cannot turn a zero deviation into a tiny non-zero one.
+            if spread.count(spread[0]) == count:
+                continue
+            spread_mean = fsum(spread) / count
+            spread_std = sqrt(fsum((value - spread_mean) ** 2 for value in spread) / count)
+            if spread_std == 0:
+                continue
+            latest = (spread[-1] - spread_mean) / spread_std
+            matrix[i][j] = latest
+            matrix[j][i] = -latest
+            if extreme is None or abs(latest) > abs(extreme_score):
+                extreme = (i, j, spread_mean, spread_std)
+                extreme_score = latest
 
-    if not latest_scores:
+    if extreme is None:
         return ToolResult(
             name="zscore",
             summary="Unable to compute z-scores for the provided data.",
             images=[],
         )
 
-    matrix = [[0.0 for _ in tickers] for _ in tickers]
-    for i, left in enumerate(tickers):
-        for j, right in enumerate(tickers):
-            if left == right:
-                continue
-            if (left, right) in latest_scores:
-                matrix[i][j] = latest_scores[(left, right)]
-            elif (right, left) in latest_scores:
-                matrix[i][j] = -latest_scores[(right, left)]
-
-    heatmap_fig = plot_heatmap(matrix, tickers, "Latest Pairwise Z-Scores")
-    heatmap_payload = figure_to_payload(heatmap_fig)
+    charts = PayloadBatch()
+    charts.add(plot_heatmap(matrix, tickers, "Latest Pairwise Z-Scores"))
 
-    most_extreme_pair = max(latest_scores.items(), key=lambda item: abs(item[1]))[0]
-    z_series = zscore_history[most_extreme_pair]
+    i, j, spread_mean, spread_std = extreme
+    most_extreme_pair = (tickers[i], tickers[j])
+    z_series = [(l - r - spread_mean) / spread_std for l, r in zip(columns[i], columns[j])]
     line_chart_fig = plot_lines(
-        dates=[date.isoformat() for date in data.dates],
+        dates=data.dates,
         series_map={f"{most_extreme_pair[0]}-{most_extreme_pair[1]}": z_series},
         title="Spread Z-Score Over Time",
         y_label="Z-Score",
         horizontal_lines=[(0, "#555555"), (2, "#d62728"), (-2, "#2ca02c")],
     )
-    line_chart_payload = figure_to_payload(line_chart_fig)
+    charts.add(line_chart_fig)
 
     summary = (
         f"Largest divergence observed for {most_extreme_pair[0]} vs {most_extreme_pair[1]} "
-        f"(z-score {latest_scores[most_extreme_pair]:.2f})."
+        f"(z-score {extreme_score:.2f})."
     )
 
     return ToolResult(
         name="zscore",
         summary=summary,
-        images=[heatmap_payload, line_chart_payload],
+        images=charts.payloads(),
     )
@@ -5,6 +5,9 @@ from typing import Any, Callable, Dict
 Boundary = bytes
 Callback = Callable[[bytes, int, int], None]
 
+# Byte values trimmed from either end of a part, like ``bytes.strip(b"\r\n")``.
+_CRLF = frozenset(b"\r\n")
+
 
 class MultipartParseError(RuntimeError):
     """Raised when the simplified multipart parser encounters invalid data."""
@@ -27,19 +30,28 @@ def parse_options_header(value: Any) -> tuple[Any, Dict[bytes, bytes]]:
     else:
         header = str(value)
 
-    parts = [part.strip() for part in header.split(";") if part.strip()]
-    if not parts:
-        return header, {}
-
-    main_value = parts[0]
+    # One pass over the ";"-separated items; the first non-empty item is the
+    # main value and later "key=value" items become parameters.
+    main_value = None
     params: Dict[bytes, bytes] = {}
-    for item in parts[1:]:
-        if "=" not in item:
+    pos, length = 0, len(header)
+    while pos <= length:
+        semi = header.find(";", pos)
+        if semi == -1:
+            semi = length
+        item = header[pos:semi].strip()
+        pos = semi + 1
+        if not item:
             continue
-        key, raw_value = item.split("=", 1)
-        key_bytes = key.strip().lower().encode("latin-1")
-        value_str = raw_value.strip().strip('"')
-        params[key_bytes] = value_str.encode("latin-1")
+        if main_value is None:
+            main_value = item
+            continue
+        key, eq, raw_value = item.partition("=")
+        if not eq:
+            continue
+        params[key.strip().lower().encode("latin-1")] = raw_value.strip().strip('"').encode("latin-1")
+    if main_value is None:
+        return header, {}
     return main_value, params
 
 
@@ -69,31 +81,45 @@ class MultipartParser:
         self._buffer.extend(data)
 
     def finalize(self) -> None:
-        data = bytes(self._buffer)
+        # Search the accumulated bytearray in place instead of copying the whole
+        # body into a bytes object first.
+        data = self._buffer
         if not data:
             return
 
-        parts = data.split(self._boundary)
-        if len(parts) < 2:
+        boundary = self._boundary
+        pos = data.find(boundary)
+        if pos == -1:
             return
 
-        # Skip the preamble (index 0) and iterate over actual parts.
-        for segment in parts[1:]:
-            if segment.startswith(b"--"):
+        # Walk the boundaries with find() rather than split() so only the part
+        # being parsed is copied, not every part of the body at once. The text
+        # before the first boundary is the preamble and is skipped.
+        while pos != -1:
+            start = pos + len(boundary)
+            pos = data.find(boundary, start)
+            end = pos if pos != -1 else len(data)
+            if data.startswith(b"--", start, end):
                 break
-            segment = segment.lstrip(b"\r\n")
-            if not segment:
+            while start < end and data[start] in _CRLF:
+                start += 1
+            while end > start and data[end - 1] in _CRLF:
+                end -= 1
+            if start == end:
                 continue
-            self._parse_segment(segment.rstrip(b"\r\n"))
+            self._parse_segment(data, start, end)
 
         end_callback = self._callbacks.get("on_end")
         if end_callback:
             end_callback()
 
-    def _parse_segment(self, segment: bytes) -> None:
-        header_blob, sep, body = segment.partition(b"\r\n\r\n")
-        if not sep:
+    def _parse_segment(self, data: bytearray, start: int, end: int) -> None:
+        split = data.find(b"\r\n\r\n", start, end)
+        if split == -1:
             raise MultipartParseError("Multipart segment missing header/body separator")
+        with memoryview(data) as view:
+            header_blob = view[start:split].tobytes()
+            body = view[split + 4 : end].tobytes()
         headers = header_blob.split(b"\r\n")
 
         part_begin = self._callbacks.get("on_part_begin")
@@ -0,0 +1,24 @@
+import pathlib
+import sys
+
+import pytest
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture
+def stub_charts(monkeypatch):
+    """Swap chart rendering for placeholder figures in tests that only check summaries."""
+
+    def fake_plot(*args, **kwargs):
+        return type("DummyFigure", (), {"payload": "chart stubbed in tests"})()
+
+    for target in (
+        "app.tools.rsi.plot_lines",
+        "app.tools.sma.plot_lines",
+        "app.tools.zscore.plot_lines",
+        "app.tools.zscore.plot_heatmap",
+    ):
+        monkeypatch.setattr(target, fake_plot)
@@ -3,30 +3,30 @@ import base64
 import datetime as dt
 import io
 import pathlib
-import sys
+import threading
+import time
+import types
 
 import pytest
 from fastapi import HTTPException, UploadFile
 
-ROOT = pathlib.Path(__file__).resolve().parents[1]
-if str(ROOT) not in sys.path:
-    sys.path.insert(0, str(ROOT))
-
 from app.routers import analysis
 from app.routers.analysis import agent_service
-
-
-def _sample_csv_payload() -> str:
-    base_date = dt.date(2024, 1, 1)
-    rows = ["Date,Ticker,Close"]
-    for i in range(30):
-        rows.append(
-            f"{(base_date + dt.timedelta(days=i)).isoformat()},AAA,{100 + i}"
-        )
-        rows.append(
-            f"{(base_date + dt.timedelta(days=i)).isoformat()},BBB,{120 - i}"
-        )
-    return "\n".join(rows)
+from app.services import agent as agent_module
+from app.services import sources, visuals
+from app.services.agent import AgentService
+from app.services.models import ToolResult
+from app.services.preprocess import clean_stock_data
+
+
+@pytest.fixture(scope="session")
+def sample_csv() -> bytes:
+    base_date = dt.date(2024, 1, 1).toordinal()
+    dates = [dt.date.fromordinal(base_date + i).isoformat() for i in range(30)]
+    body = "\n".join(
+        f"{date},AAA,{100 + i}\n{date},BBB,{120 - i}" for i, date in enumerate(dates)
+    )
+    return f"Date,Ticker,Close\n{body}".encode("utf-8")
 
 
 def _csv_without_ticker() -> str:
@@ -95,11 +95,10 @@ def _invoke_run_analysis(
     )
 
 
-def test_analysis_endpoint_returns_results():
-    csv_payload = _sample_csv_payload()
+def test_analysis_endpoint_returns_results(sample_csv):
     result = _invoke_run_analysis(
         "Please run zscore, rsi and sma analysis",
-        csv_payload=csv_payload,
+        upload_bytes=sample_csv,
     )
     assert set(result.tool_summaries.keys()) == {"zscore", "rsi", "sma"}
     for images in result.images.values():
@@ -112,6 +111,76 @@ def test_analysis_endpoint_returns_results():
                 assert base64.b64decode(payload.data)
 
 
+@pytest.mark.parametrize(
+    "tools",
+    [("zscore",), ("rsi",), ("sma",), ("zscore", "rsi"), ("rsi", "sma")],
+)
+@pytest.mark.usefixtures("stub_charts")
+def test_analysis_runs_only_requested_tools(sample_csv, tools):
+    result = _invoke_run_analysis(
+        f"Please run {' and '.join(tools)} analysis",
+        upload_bytes=sample_csv,
+    )
+    assert set(result.tool_summaries) == set(tools)
+    assert set(result.images) <= set(tools)
+
+
+@pytest.mark.usefixtures("stub_charts")
+def test_concurrent_analyses_on_one_event_loop(sample_csv):
+    queries = ["Please run zscore analysis", "Please run rsi analysis", "Please run sma analysis"]
+
+    async def run_all():
+        return await asyncio.gather(
+            *(
+                analysis.run_analysis(
+                    query=query,
+                    tickers=None,
+                    start_date=None,
+                    end_date=None,
+                    upload_file=UploadFile(filename="upload.csv", file=io.BytesIO(sample_csv)),
+                )
+                for query in queries
+            )
+        )
+
+    results = asyncio.run(run_all())
+    assert [set(result.tool_summaries) for result in results] == [{"zscore"}, {"rsi"}, {"sma"}]
+
+
+def test_concurrent_multi_tool_analyses_run_side_by_side(monkeypatch, sample_csv):
+    requests = 8
+    tool_names = ("zscore", "rsi", "sma")
+    # Every tool call of every request has to be in flight at once to pass.
+    barrier = threading.Barrier(requests * len(tool_names), timeout=10)
+
+    def fake_tool(name):
+        def run(data):
+            barrier.wait()
+            return ToolResult(name=name, summary=f"{name} ok", images=[])
+
+        return run
+
+    for name in tool_names:
+        monkeypatch.setitem(agent_service._tool_map, name, fake_tool(name))
+
+    async def run_all():
+        return await asyncio.gather(
+            *(
+                analysis.run_analysis(
+                    query="Please run zscore, rsi and sma analysis",
+                    tickers=None,
+                    start_date=None,
+                    end_date=None,
+                    upload_file=UploadFile(filename="upload.csv", file=io.BytesIO(sample_csv)),
+                )
+                for _ in range(requests)
+            )
+        )
+
+    results = asyncio.run(run_all())
+    assert all(set(result.tool_summaries) == set(tool_names) for result in results)
+
+
 def test_missing_data_returns_error():
     with pytest.raises(HTTPException) as excinfo:
         _invoke_run_analysis("test")
@@ -201,3 +270,285 @@ def test_local_static_path_used_when_base_url_absent(monkeypatch):
     for payload in result.images["sma"]:
         assert payload.encoding == "url"
         assert payload.data.startswith("/static/visuals/")
+
+
+def test_market_data_cache_expires_evicts_and_copies(monkeypatch):
+    downloads: list[tuple[str, ...]] = []
+    clock = [1000.0]
+
+    def fake_download(symbols, start, end):
+        downloads.append(tuple(symbols))
+        if symbols == ["EMPTY"]:
+            return []
+        return _market_records(symbols[0], dt.date(2024, 1, 1), days=3)
+
+    monkeypatch.setattr(sources, "yf", object())
+    monkeypatch.setattr(sources, "_download_market_data", fake_download)
+    monkeypatch.setattr(sources, "time", types.SimpleNamespace(monotonic=lambda: clock[0]))
+    sources.clear_market_data_cache()
+    try:
+        first = sources.load_market_data(["aapl"])
+        first.append({"Date": dt.date(2024, 2, 1), "Ticker": "AAPL", "Close": 0})
+        # A hit returns a fresh copy, unaffected by changes to earlier results.
+        assert sources.load_market_data(["AAPL"]) == _market_records("AAPL", dt.date(2024, 1, 1), days=3)
+        assert downloads == [("AAPL",)]
+
+        clock[0] += sources._CACHE_TTL_SECONDS
+        sources.load_market_data(["AAPL"])
+        assert downloads == [("AAPL",)] * 2
+
+        # Empty downloads are not cached.
+        assert sources.load_market_data(["EMPTY"]) == []
+        assert sources.load_market_data(["EMPTY"]) == []
+        assert downloads.count(("EMPTY",)) == 2
+
+        # Filling the cache with other keys evicts the least recently used one.
+        for idx in range(sources._CACHE_MAX_ENTRIES):
+            sources.load_market_data([f"T{idx}"])
+        assert len(sources._cache) == sources._CACHE_MAX_ENTRIES
+        sources.load_market_data(["AAPL"])
+        assert downloads.count(("AAPL",)) == 3
+    finally:
+        sources.clear_market_data_cache()
+
+
+def test_summary_cache_hits_skip_the_llm_and_stay_bounded(monkeypatch):
+    replies: dict[str, object] = {}
+    calls: list[str] = []
+
+    class _Responses:
+        def create(self, **kwargs):
+            prompt = kwargs["input"][-1]["content"]
+            calls.append(prompt)
+            reply = next((value for key, value in replies.items() if key in prompt), "ok")
+            if isinstance(reply, Exception):
+                raise reply
+            return types.SimpleNamespace(output=(), output_text=reply)
+
+    class _Client:
+        responses = _Responses()
+
+    notes = {"zscore": "AAA is stretched"}
+    service = AgentService(llm_client=_Client())
+    assert service._generate_summary_with_llm("q1", notes) == "ok"
+    assert service._generate_summary_with_llm("q1", notes) == "ok"
+    assert len(calls) == 1
+
+    # Failed and empty replies are retried rather than cached.
+    replies["q-empty"] = ""
+    replies["q-fail"] = RuntimeError("offline")
+    for query in ("q-empty", "q-empty", "q-fail", "q-fail"):
+        assert service._generate_summary_with_llm(query, notes) is None
+    assert len(calls) == 5
+    assert len(service._summary_cache) == 1
+
+    for idx in range(agent_module._SUMMARY_CACHE_SIZE):
+        service._generate_summary_with_llm(f"bulk-{idx}", notes)
+    assert len(service._summary_cache) == agent_module._SUMMARY_CACHE_SIZE
+    calls.clear()
+    service._generate_summary_with_llm("q1", notes)
+    assert len(calls) == 1
+
+    service.clear_cache()
+    assert not service._summary_cache
+
+    uncached = AgentService(llm_client=_Client(), cache_summaries=False)
+    calls.clear()
+    uncached._generate_summary_with_llm("q1", notes)
+    uncached._generate_summary_with_llm("q1", notes)
+    assert len(calls) == 2
+    assert not uncached._summary_cache
+
+
+def test_clean_stock_data_accepts_timestamps_but_skips_garbage():
+    rows = [
+        {"Date": "2024-01-02", "Ticker": "aaa", "Close": "10"},
+        {"Date": "2024-01-03T15:30:00", "Ticker": "AAA", "Close": 11},
+        {"Date": "2024-01-04T09:30:00+05:00", "Ticker": "AAA", "Close": 12},
+        {"Date": "2024-01-05 10:00", "Ticker": "AAA", "Close": 13},
+        {"Date": "2024-01-08 garbage", "Ticker": "AAA", "Close": 14},
+        {"Date": "2024-01-09Tnope", "Ticker": "AAA", "Close": 15},
+    ]
+
+    cleaned = clean_stock_data(rows)
+
+    assert cleaned.dates == [dt.date(2024, 1, day) for day in (2, 3, 4, 5)]
+    assert cleaned.series == {"AAA": [10.0, 11.0, 12.0, 13.0]}
+
+
+class _FakeColumns(list):
+    """Just enough of a pandas column index for ``_download_market_data``."""
+
+    @property
+    def nlevels(self) -> int:
+        return 2 if self and isinstance(self[0], tuple) else 1
+
+    def get_level_values(self, level: int) -> list[str]:
+        return [key[level] for key in self]
+
+
+class _FakeSeries:
+    def __init__(self, dates: list[dt.date], values: list[float | None]) -> None:
+        self.index = types.SimpleNamespace(date=dates)
+        self._values = values
+
+    def dropna(self) -> "_FakeSeries":
+        kept = [(date, value) for date, value in zip(self.index.date, self._values) if value is not None]
+        return _FakeSeries([date for date, _ in kept], [value for _, value in kept])
+
+    def tolist(self) -> list[float | None]:
+        return list(self._values)
+
+
+class _FakeFrame:
+    def __init__(self, data: dict[object, _FakeSeries]) -> None:
+        self._data = data
+        self.columns = _FakeColumns(data)
+
+    def __getitem__(self, key: object) -> _FakeSeries:
+        return self._data[key]
+
+    def xs(self, key: str, axis: int, level: int) -> "_FakeFrame":
+        assert axis == 1
+        return _FakeFrame(
+            {column[1 - level]: series for column, series in self._data.items() if column[level] == key}
+        )
+
+
+@pytest.mark.parametrize("layout", ["ticker_field", "field_ticker", "single"])
+def test_download_market_data_flattens_each_column_layout(monkeypatch, layout):
+    dates = [dt.date(2024, 1, 2), dt.date(2024, 1, 3), dt.date(2024, 1, 4)]
+    closes = {"AAA": [10.0, None, 12.0], "BBB": [20.0, 21.0, 22.0]}
+    if layout == "single":
+        symbols = ["AAA"]
+        frame = _FakeFrame(
+            {"Open": _FakeSeries(dates, [9.0, 9.0, 9.0]), "Close": _FakeSeries(dates, closes["AAA"])}
+        )
+    else:
+        symbols = ["AAA", "BBB"]
+        data = {}
+        for ticker, values in closes.items():
+            for field, series in (("Open", [1.0, 1.0, 1.0]), ("Close", values)):
+                key = (ticker, field) if layout == "ticker_field" else (field, ticker)
+                data[key] = _FakeSeries(dates, series)
+        frame = _FakeFrame(data)
+    requests: list[dict[str, object]] = []
+
+    def fake_download(**kwargs):
+        requests.append(kwargs)
+        return frame
+
+    monkeypatch.setattr(sources, "yf", types.SimpleNamespace(download=fake_download))
+
+    records = sources._download_market_data(symbols, dt.date(2024, 1, 1), dt.date(2024, 1, 5))
+
+    assert requests[0]["tickers"] == symbols
+    assert requests[0]["start"] == "2024-01-01"
+    expected = [
+        {"Date": date, "Ticker": ticker, "Close": value}
+        for ticker in symbols
+        for date, value in zip(dates, closes[ticker])
+        if value is not None
+    ]
+    assert records == expected
+
+
+def test_payload_batch_uploads_concurrently_and_keeps_order(monkeypatch):
+    class _Figure:
+        def __init__(self, name: str) -> None:
+            self.name = name
+
+        def savefig(self, *args, **kwargs):  # pragma: no cover - rendering is stubbed
+            raise AssertionError("PNG rendering is stubbed in this test")
+
+    # The first upload finishes last, so completion order differs from insertion order.
+    delays = {b"first": 0.2, b"second": 0.0, b"third": 0.1}
+    upload_threads: list[str] = []
+
+    def fake_upload(content, config):
+        upload_threads.append(threading.current_thread().name)
+        time.sleep(delays[content])
+        return f"https://blob.example.com/{content.decode()}.png"
+
+    monkeypatch.setattr(visuals, "_figure_to_png_bytes", lambda fig: fig.name.encode())
+    monkeypatch.setattr(visuals, "_upload_to_azure", fake_upload)
+    monkeypatch.setattr(visuals, "BlobServiceClient", object)
+    config = visuals.VisualConfig(
+        connection_string="UseDevelopmentStorage=true",
+        container_name="charts",
+        static_base_url=None,
+    )
+
+    batch = visuals.PayloadBatch(config)
+    batch.add(_Figure("first"))
+    batch.add(type("DummyFigure", (), {"payload": "no chart"})())
+    batch.add(_Figure("second"))
+    batch.add(_Figure("third"))
+    payloads = batch.payloads()
+
+    assert [(payload.content_type, payload.encoding) for payload in payloads] == [
+        ("image/png", "url"),
+        ("text/plain", "base64"),
+        ("image/png", "url"),
+        ("image/png", "url"),
+    ]
+    assert payloads[0].data == "https://blob.example.com/first.png"
+    assert base64.b64decode(payloads[1].data) == b"no chart"
+    assert payloads[2].data == "https://blob.example.com/second.png"
+    assert payloads[3].data == "https://blob.example.com/third.png"
+    assert len(upload_threads) == 3
+    assert all(name.startswith("chart-upload") for name in upload_threads)
+
+
+def test_interpret_query_reuses_plan_within_a_day(monkeypatch):
+    service = AgentService(llm_client=None)
+    today = dt.date(2024, 7, 1)
+    monkeypatch.setattr(service, "_today", lambda: today)
+
+    first = service.interpret_query("AAPL past six months sma")
+    assert service.interpret_query("AAPL past six months sma") is first
+
+    today = dt.date(2024, 7, 2)
+    rolled = service.interpret_query("AAPL past six months sma")
+    assert rolled is not first
+    assert rolled.end_date == dt.date(2024, 7, 2)
+
+
+def test_default_lookback_clamps_to_month_end():
+    service = AgentService(llm_client=None)
+
+    assert service.default_lookback(1, dt.date(2024, 3, 31)) == dt.date(2024, 2, 29)
+    assert service.default_lookback(12, dt.date(2024, 1, 15)) == dt.date(2023, 1, 15)
+    assert service.default_lookback(14, dt.date(2024, 2, 29)) == dt.date(2022, 12, 29)
+
+
+def test_interpret_query_skips_llm_for_complete_heuristic_plan(monkeypatch):
+    calls: list[str] = []
+
+    class _Responses:
+        def create(self, **kwargs):
+            calls.append(kwargs["model"])
+            raise RuntimeError("offline")
+
+    class _Client:
+        responses = _Responses()
+
+    service = AgentService(llm_client=_Client())
+    monkeypatch.setattr(service, "_today", lambda: dt.date(2024, 7, 1))
+
+    plan = service.interpret_query("AAPL rsi past 3 months")
+    assert plan.tickers == ("AAPL",)
+    assert plan.start_date == dt.date(2024, 4, 1)
+    assert calls == []
+
+    service.interpret_query("AAPL rsi past 3 months", force_llm=True)
+    service.interpret_query("rsi for the usual names")
+    assert len(calls) == 2
+
+    # Tickers and dates alone are not enough: no analysis was named.
+    service.interpret_query("AAPL past 3 months")
+    assert len(calls) == 3
+
+    monkeypatch.setenv("STAT_TOOL_FAST_PATH", "0")
+    AgentService(llm_client=_Client()).interpret_query("AAPL rsi past 3 months")
+    assert len(calls) == 4